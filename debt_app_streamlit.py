@@ -1,149 +1,104 @@
 import json
 import os
-import copy
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 
+from payoff_core import Card, simulate_arrays
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used instead
+    orjson = None
+
 META_FILE = "cards_meta.json"
 BAL_FILE = "balances.json"
 
 
 # ---------------- Core logic ----------------
 
-@dataclass
-class Card:
-    name: str
-    balance: float
-    apr: float  # percent
+def _pay_card(by_name: Dict[str, Card], card_name: str, amount: float) -> None:
+    if amount < 0:
+        raise ValueError("Payment amount must be >= 0")
+    c = by_name.get(card_name)
+    if c is None:
+        raise KeyError(f"Card '{card_name}' not found.")
+    c.balance = max(0.0, c.balance - amount)
 
 
-def monthly_rate(apr_percent: float) -> float:
-    return (apr_percent / 100.0) / 12.0
+def apply_one_time_payment(cards: List[Card], card_name: str, amount: float) -> None:
+    _pay_card({c.name: c for c in cards}, card_name, amount)
 
 
-def total_balance(cards: List[Card]) -> float:
-    return sum(c.balance for c in cards)
+def apply_payments(cards: List[Card], payments: List[Dict]) -> None:
+    """Apply queued {"card": name, "amt": amount} payments with one name lookup table."""
+    by_name = {c.name: c for c in cards}
+    for p in payments:
+        _pay_card(by_name, p["card"], p["amt"])
 
 
-def apply_one_time_payment(cards: List[Card], card_name: str, amount: float) -> None:
-    if amount < 0:
-        raise ValueError("Payment amount must be >= 0")
-    for c in cards:
-        if c.name == card_name:
-            c.balance = max(0.0, c.balance - amount)
-            return
-    raise KeyError(f"Card '{card_name}' not found.")
-
-
-def simulate_payoff_total_budget(
-    cards: List[Card],
-    monthly_budget: float,
-    strategy: str = "avalanche",
-    max_months: int = 2000,
-    epsilon: float = 1e-6,
-) -> Dict:
-    if monthly_budget <= 0:
-        raise ValueError("monthly_budget must be > 0")
-
-    cards = copy.deepcopy(cards)
-    months = 0
-    total_interest_paid = 0.0
-
-    while total_balance(cards) > epsilon:
-        months += 1
-        if months > max_months:
-            return {
-                "paid_off": False,
-                "months": months,
-                "total_interest": total_interest_paid,
-                "reason": "Hit max_months (budget may be too low).",
-            }
-
-        # 1) interest accrues
-        for c in cards:
-            if c.balance > epsilon:
-                intr = c.balance * monthly_rate(c.apr)
-                c.balance += intr
-                total_interest_paid += intr
-
-        # 2) allocate payments
-        remaining = monthly_budget
-        active = [c for c in cards if c.balance > epsilon]
-
-        if strategy == "avalanche":
-            active.sort(key=lambda x: (-x.apr, x.balance))
-            for c in active:
-                if remaining <= epsilon:
-                    break
-                pay = min(c.balance, remaining)
-                c.balance -= pay
-                remaining -= pay
-
-        elif strategy == "snowball":
-            active.sort(key=lambda x: (x.balance, -x.apr))
-            for c in active:
-                if remaining <= epsilon:
-                    break
-                pay = min(c.balance, remaining)
-                c.balance -= pay
-                remaining -= pay
-
-        elif strategy == "proportional":
-            total_bal = sum(c.balance for c in active)
-            if total_bal <= epsilon:
-                break
-            for c in active:
-                share = remaining * (c.balance / total_bal)
-                pay = min(c.balance, share)
-                c.balance -= pay
-
-        else:
-            raise ValueError("Unknown strategy")
-
-    return {
-        "paid_off": True,
-        "months": months,
-        "total_interest": total_interest_paid,
-    }
+# ---------------- Persistence ----------------
 
+def _json_dumps(data) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(data, indent=2)
+
+
+def _read_json(path: str):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
-# ---------------- Persistence ----------------
 
+def _write_json(path: str, data) -> None:
+    """Write JSON to a temp file and swap it in, so a crash never leaves a partial file."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(_json_dumps(data))
+    os.replace(tmp, path)
+
+
+@st.cache_data(show_spinner=False)
 def load_meta() -> List[Dict]:
     if not os.path.exists(META_FILE):
         return []
-    with open(META_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _read_json(META_FILE)
 
 
 def save_meta(meta: List[Dict]) -> None:
-    with open(META_FILE, "w", encoding="utf-8") as f:
-        json.dump(meta, f, indent=2)
+    _write_json(META_FILE, meta)
+    load_meta.clear()
 
 
+@st.cache_data(show_spinner=False)
 def load_balances() -> Dict[str, float]:
     if not os.path.exists(BAL_FILE):
         return {}
-    with open(BAL_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = _read_json(BAL_FILE)
     return {k: float(v) for k, v in data.items()}
 
 
 def save_balances(balances: Dict[str, float]) -> None:
-    with open(BAL_FILE, "w", encoding="utf-8") as f:
-        json.dump(balances, f, indent=2)
+    _write_json(BAL_FILE, balances)
+    load_balances.clear()
 
 
 def persist_current_balances(meta: List[Dict]) -> None:
-    """Save current balance widgets to BAL_FILE."""
+    """Save current balance widgets to BAL_FILE (skipped if unchanged since the last save)."""
     out: Dict[str, float] = {}
     for m in meta:
         name = m["name"]
         key = f"bal::{name}"
         out[name] = float(st.session_state.get(key, 0.0))
+
+    digest = hash(_json_dumps(out))
+    if st.session_state.get("_bal_hash") == digest:
+        return
     save_balances(out)
+    st.session_state["_bal_hash"] = digest
 
 
 # ---------------- UI helpers ----------------
@@ -196,6 +151,18 @@ def build_cards_from_inputs(meta: List[Dict], saved_balances: Optional[Dict[str,
     return cards
 
 
+# bounded: every distinct balance edit is a new key
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_sim(
+    balances: Tuple[float, ...],
+    aprs: Tuple[float, ...],
+    budgets: Tuple[float, ...],
+    strategy: str,
+) -> List[Dict]:
+    """Memoized simulate_multi_budget keyed on the exact balances and APRs it simulates."""
+    return simulate_arrays(np.array(balances), np.array(aprs), budgets, strategy)
+
+
 def principal_sum(cards: List[Card]) -> float:
     return sum(c.balance for c in cards)
 
@@ -287,6 +254,7 @@ with st.sidebar:
                 os.remove(META_FILE)
             except FileNotFoundError:
                 pass
+            load_meta.clear()
             st.warning("Deleted saved cards. Refreshing…")
             st.rerun()
 
@@ -295,6 +263,8 @@ with st.sidebar:
                 os.remove(BAL_FILE)
             except FileNotFoundError:
                 pass
+            load_balances.clear()
+            st.session_state.pop("_bal_hash", None)
             st.warning("Deleted balances.json. Refreshing…")
             st.rerun()
 
@@ -305,22 +275,39 @@ if not meta:
 st.subheader("1) Enter current balances (defaults to last run)")
 st.write("Balances auto-fill from your last run. Click **Run simulation** to compute and auto-save balances.")
 
-# Balance inputs (default to saved_balances)
+# Balance inputs (default to saved_balances), edited as one table so a
+# whole round of edits costs a single rerun
+bal_base = st.session_state.setdefault("bal_base", {})
 for m in meta:
     name = m["name"]
-    apr = float(m["apr"])
     key = f"bal::{name}"
 
     # default only once per session
     if key not in st.session_state:
         st.session_state[key] = float(saved_balances.get(name, 0.0))
-
-    st.number_input(
-        f"{name} (APR {apr:.2f}%) balance",
-        min_value=0.0,
-        step=10.0,
-        key=key,
-    )
+    # the editor's base data stays fixed; its edits live in the widget state
+    bal_base.setdefault(name, st.session_state[key])
+
+edited = st.data_editor(
+    pd.DataFrame(
+        {
+            "card": [m["name"] for m in meta],
+            "apr": [float(m["apr"]) for m in meta],
+            "balance": [bal_base[m["name"]] for m in meta],
+        }
+    ),
+    column_config={
+        "card": st.column_config.TextColumn("Card"),
+        "apr": st.column_config.NumberColumn("APR (%)", format="%.2f"),
+        "balance": st.column_config.NumberColumn("Balance", min_value=0.0, step=10.0, format="%.2f"),
+    },
+    disabled=["card", "apr"],
+    hide_index=True,
+    num_rows="fixed",
+    key="bal_editor",
+)
+for name, bal in zip(edited["card"], edited["balance"]):
+    st.session_state[f"bal::{name}"] = 0.0 if pd.isna(bal) else float(bal)
 
 st.subheader("2) Optional: payments already made this month")
 st.write("These payments reduce balances BEFORE simulations (they do not change your saved APRs/names).")
@@ -366,19 +353,22 @@ if run:
     cards = build_cards_from_inputs(meta, saved_balances=saved_balances)
 
     # Apply one-time payments for simulation
-    for p in st.session_state.get("payment_list", []):
-        apply_one_time_payment(cards, p["card"], p["amt"])
+    apply_payments(cards, st.session_state.get("payment_list", []))
 
     st.markdown(f"### Results (Strategy: **{STRATEGIES[strategy]['label']}**)")
 
-    res_800 = simulate_payoff_total_budget(cards, monthly_budget=800.0, strategy=strategy)
-    render_result("$800/mo", cards, res_800)
-
-    res_1000 = simulate_payoff_total_budget(cards, monthly_budget=1000.0, strategy=strategy)
-    render_result("$1000/mo", cards, res_1000)
-
+    scenarios = [("$800/mo", 800.0), ("$1000/mo", 1000.0)]
     if custom_budget and custom_budget > 0:
-        res_custom = simulate_payoff_total_budget(cards, monthly_budget=float(custom_budget), strategy=strategy)
-        render_result(f"${custom_budget:,.2f}/mo", cards, res_custom)
+        scenarios.append((f"${custom_budget:,.2f}/mo", float(custom_budget)))
+
+    # all budgets run in one simulator pass
+    results = _cached_sim(
+        tuple(c.balance for c in cards),
+        tuple(c.apr for c in cards),
+        tuple(budget for _, budget in scenarios),
+        strategy,
+    )
+    for (title, _), res in zip(scenarios, results):
+        render_result(title, cards, res)
 else:
     st.info("Choose a strategy in the sidebar, enter balances, then click **Run simulation**.")
@@ -0,0 +1,82 @@
+import copy
+import random
+from typing import Dict, List
+
+import pytest
+
+from payoff_core import Card, monthly_rate, simulate_multi_budget
+
+
+def reference_simulate(cards: List[Card], monthly_budget: float, strategy: str) -> Dict:
+    """The original month-by-month loop, kept verbatim as the oracle."""
+    max_months, epsilon = 2000, 1e-6
+    cards = copy.deepcopy(cards)
+    months = 0
+    total_interest_paid = 0.0
+
+    while sum(c.balance for c in cards) > epsilon:
+        months += 1
+        if months > max_months:
+            return {"paid_off": False, "months": months, "total_interest": total_interest_paid}
+
+        for c in cards:
+            if c.balance > epsilon:
+                intr = c.balance * monthly_rate(c.apr)
+                c.balance += intr
+                total_interest_paid += intr
+
+        remaining = monthly_budget
+        active = [c for c in cards if c.balance > epsilon]
+
+        if strategy in ("avalanche", "snowball"):
+            if strategy == "avalanche":
+                active.sort(key=lambda x: (-x.apr, x.balance))
+            else:
+                active.sort(key=lambda x: (x.balance, -x.apr))
+            for c in active:
+                if remaining <= epsilon:
+                    break
+                pay = min(c.balance, remaining)
+                c.balance -= pay
+                remaining -= pay
+        else:
+            total_bal = sum(c.balance for c in active)
+            if total_bal <= epsilon:
+                break
+            for c in active:
+                share = remaining * (c.balance / total_bal)
+                c.balance -= min(c.balance, share)
+
+    return {"paid_off": True, "months": months, "total_interest": total_interest_paid}
+
+
+def random_portfolio(rng: random.Random) -> List[Card]:
+    cards = []
+    for i in range(rng.randint(1, 7)):
+        balance = 0.0 if rng.random() < 0.1 else round(rng.uniform(0, 8000), 2)
+        apr = rng.choice([0.0, 9.99, 19.99, 24.99, 27.0, round(rng.uniform(0, 35), 2)])
+        cards.append(Card(name=f"c{i}", balance=balance, apr=apr))
+    return cards
+
+
+@pytest.mark.parametrize("strategy", ["avalanche", "snowball", "proportional"])
+def test_matches_reference_loop(strategy):
+    rng = random.Random(strategy)
+    budgets = [50.0, 200.0, 800.0, 1000.0, 2500.0, 40000.0]
+    for _ in range(150):
+        cards = random_portfolio(rng)
+        results = simulate_multi_budget(cards, budgets, strategy)
+        for budget, res in zip(budgets, results):
+            expected = reference_simulate(cards, budget, strategy)
+            assert res["paid_off"] == expected["paid_off"]
+            assert res["months"] == expected["months"]
+            if expected["paid_off"]:
+                assert res["total_interest"] == pytest.approx(expected["total_interest"], rel=1e-6, abs=1e-6)
+
+
+@pytest.mark.parametrize("strategy", ["avalanche", "snowball", "proportional"])
+def test_closed_form_tail_respects_epsilon(strategy):
+    # the last card ends one dust-sized step above a whole number of payments
+    cards = [Card("a", 100.0, 0.0), Card("b", 1500.0000005, 0.0)]
+    res = simulate_multi_budget(cards, [800.0], strategy)[0]
+    assert res["months"] == reference_simulate(cards, 800.0, strategy)["months"] == 2